@@ -1,7 +1,14 @@
-import json
+import asyncio
+import base64
+import copy
+import functools
+import hashlib
 import logging
 import re
-import aiohttp
+import time
+import httpx
+import orjson
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Union, List, Tuple
 from urllib.parse import urlparse, urlencode, parse_qs, urlunparse, parse_qsl
 from enum import Enum
@@ -11,6 +18,94 @@ from utils.config import settings
 
 logger = logging.getLogger(__name__)
 
+# SSL contexts built once per process — loading the CA bundle is ~100 ms
+# cold, and sharing a context lets OpenSSL reuse its TLS session cache
+# (session resumption saves a round trip per handshake).
+_VERIFY_CTX = ssl.create_default_context()
+_NOVERIFY_CTX = ssl.create_default_context()
+_NOVERIFY_CTX.check_hostname = False
+_NOVERIFY_CTX.verify_mode = ssl.CERT_NONE
+
+# Patterns used by _parse_natural_language_request, compiled once at import
+# so each call skips re-compilation and the re module's cache lookup.
+_METHOD_RE = re.compile(r'^(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS)\s+', re.IGNORECASE)
+_URL_RE = re.compile(r'(https?://[^\s\?&#]+|www\.[^\s\?&#]+)', re.IGNORECASE)
+_API_KEY_RE = re.compile(r'(?:api[_-]?key|token)[\s:]+([\w-]+)', re.IGNORECASE)
+_BASIC_AUTH_RE = re.compile(r'user(?:name)?[\s:]+([^\s,;]+)[\s,;]+pass(?:word)?[\s:]+([^\s,;]+)', re.IGNORECASE)
+_FORM_RE = re.compile(r'(\w+)=([^\s,;]+)')
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+# Content types treated as JSON without scanning the whole header value
+_JSON_CONTENT_TYPES = frozenset({
+    'application/json',
+    'application/vnd.api+json',
+    'application/problem+json',
+})
+
+# GET/HEAD response cache bounds
+_CACHE_MAX_ENTRIES = 256
+_CACHE_DEFAULT_TTL = 60.0
+
+# Pool of reusable read buffers for streamed responses. Repeated tool calls
+# tend to produce similar-size payloads, so recycling slabs avoids repeated
+# large allocations and the GC churn that comes with them.
+_BUF_POOL: List[bytearray] = []
+_BUF_POOL_MAX = 8
+
+
+@functools.lru_cache(maxsize=64)
+def _basic_auth(username: str, password: str) -> str:
+    """Build (and memoize) a Basic Authorization header value."""
+    credentials = f"{username}:{password}".encode('utf-8')
+    return "Basic " + base64.b64encode(credentials).decode('utf-8')
+
+
+def _acquire_buffer() -> bytearray:
+    """Take a buffer from the pool, or allocate a fresh one."""
+    if _BUF_POOL:
+        return _BUF_POOL.pop()
+    return bytearray()
+
+
+def _release_buffer(buf: bytearray) -> None:
+    """Return a cleared buffer to the pool (capped to avoid hoarding)."""
+    if len(_BUF_POOL) < _BUF_POOL_MAX:
+        del buf[:]
+        _BUF_POOL.append(buf)
+
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Extract the first balanced JSON object from text with a linear scan.
+
+    Replaces the old greedy r'\\{.*\\}' search, which could backtrack
+    catastrophically on pathological inputs. Tracks brace depth while
+    skipping over quoted strings and escape sequences.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '"':
+            in_string = not in_string
+        elif not in_string:
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+
+    return None
+
 class HTTPMethod(str, Enum):
     """Supported HTTP methods for API calls."""
     GET = "GET"
@@ -25,24 +120,138 @@ class APICaller:
     """
     A tool for making HTTP API calls with support for various authentication methods,
     request types, and response handling.
+
+    All instances share lazily-created httpx clients with HTTP/2 enabled, so
+    concurrent requests to the same host multiplex over one TLS connection
+    instead of paying a fresh TCP+TLS handshake each.
     """
-    
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
-        """Initialize the API caller with an optional aiohttp session."""
-        self.session = session or aiohttp.ClientSession()
+
+    # Shared clients keyed by whether they verify certificates (httpx pins
+    # the SSL configuration per client), created on first use
+    _clients: Dict[bool, httpx.AsyncClient] = {}
+    _client_lock: Optional[asyncio.Lock] = None
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """Initialize the API caller with an optional httpx client."""
+        # An explicitly injected client (e.g. in tests) takes precedence
+        # over the shared ones; otherwise a client is created lazily.
+        self.client = client
         self.default_headers = {
             "User-Agent": f"MultiAgent-APICaller/1.0",
             "Accept": "application/json",
             "Content-Type": "application/json"
         }
-        self.ssl_context = ssl.create_default_context()
-        self.ssl_context.check_hostname = False
-        self.ssl_context.verify_mode = ssl.CERT_NONE
-    
+        # LRU cache of parsed responses for idempotent GET/HEAD requests
+        self._cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = asyncio.Lock()
+
+    @staticmethod
+    def _cache_key(
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+    ) -> bytes:
+        """Build a compact cache key.
+
+        Credentialed requests never reach the cache (see call), so every
+        header can participate in the key.
+        """
+        payload = orjson.dumps([
+            method,
+            url,
+            sorted((params or {}).items()),
+            sorted((headers or {}).items()),
+        ])
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    @staticmethod
+    def _cache_ttl(response_headers) -> float:
+        """Derive a TTL from Cache-Control, defaulting to 60 seconds.
+
+        Takes the httpx Headers object (case-insensitive lookup); httpx
+        normalizes header names to lowercase, so a plain dict built from
+        it would miss the canonical 'Cache-Control' spelling.
+        """
+        cache_control = response_headers.get('cache-control') or ''
+        if 'no-store' in cache_control or 'no-cache' in cache_control:
+            return 0.0
+        max_age = _MAX_AGE_RE.search(cache_control)
+        if max_age:
+            return min(float(max_age.group(1)), 3600.0)
+        return _CACHE_DEFAULT_TTL
+
+    async def _cache_get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached response, evicting it if expired."""
+        async with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, response_data = entry
+            if time.monotonic() >= expires_at:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            # Hand out a copy so caller mutations can't poison the stored
+            # entry (same reason git_analyzer deep-copies its cache hits)
+            return copy.deepcopy(response_data)
+
+    async def _cache_put(self, key: bytes, response_data: Dict[str, Any], ttl: float):
+        """Store a response with its TTL, evicting the oldest entry if full."""
+        async with self._cache_lock:
+            self._cache[key] = (time.monotonic() + ttl, response_data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > _CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+
+    @classmethod
+    async def get_client(cls, verify_ssl: bool = True) -> httpx.AsyncClient:
+        """Get or create a shared HTTP/2 client for the given SSL mode."""
+        if cls._client_lock is None:
+            cls._client_lock = asyncio.Lock()
+
+        client = cls._clients.get(verify_ssl)
+        if client is None or client.is_closed:
+            async with cls._client_lock:
+                client = cls._clients.get(verify_ssl)
+                if client is None or client.is_closed:
+                    client = httpx.AsyncClient(
+                        http2=True,
+                        limits=httpx.Limits(
+                            max_keepalive_connections=64,
+                            max_connections=256,
+                            keepalive_expiry=60,
+                        ),
+                        verify=_VERIFY_CTX if verify_ssl else _NOVERIFY_CTX,
+                    )
+                    cls._clients[verify_ssl] = client
+
+        return client
+
+    async def _get_client(self, verify_ssl: bool = True) -> httpx.AsyncClient:
+        """Return the injected client if any, otherwise a shared one."""
+        if self.client is not None:
+            return self.client
+        return await self.get_client(verify_ssl)
+
+    async def __aenter__(self) -> "APICaller":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
     async def close(self):
-        """Close the aiohttp session."""
-        if not self.session.closed:
-            await self.session.close()
+        """Close the instance client if one was injected."""
+        if self.client and not self.client.is_closed:
+            await self.client.aclose()
+
+    @classmethod
+    async def aclose(cls):
+        """Close the shared clients (called on application shutdown)."""
+        for client in cls._clients.values():
+            if not client.is_closed:
+                await client.aclose()
+        cls._clients.clear()
     
     async def call(
         self,
@@ -56,10 +265,12 @@ class APICaller:
         timeout: int = 30,
         allow_redirects: bool = True,
         verify_ssl: bool = True,
+        stream: bool = False,
+        max_bytes: int = 512 * 1024,
     ) -> Dict[str, Any]:
         """
         Make an HTTP request to the specified URL.
-        
+
         Args:
             url: The URL to make the request to
             method: HTTP method (GET, POST, PUT, DELETE, etc.)
@@ -71,7 +282,11 @@ class APICaller:
             timeout: Request timeout in seconds
             allow_redirects: Whether to follow redirects
             verify_ssl: Whether to verify SSL certificates
-            
+            stream: Read the body in chunks and truncate at max_bytes instead
+                of buffering it whole (used for endpoints with large payloads)
+            max_bytes: Byte cap on the body when streaming; large responses
+                only get summarized by the LLM anyway
+
         Returns:
             Dict containing the response data and metadata
         """
@@ -87,58 +302,110 @@ class APICaller:
             # Handle authentication
             if auth:
                 request_headers.update(self._prepare_auth_headers(auth))
-            
-            # Prepare SSL context
-            ssl_context = None if verify_ssl else self.ssl_context
-            
+
+            # Serve idempotent reads from the LRU cache when fresh.
+            # Credentialed requests bypass it entirely: the cache is shared
+            # across callers, and serving one caller's authorized response
+            # to another presenting different credentials is a leak.
+            cache_key = None
+            if (
+                method in (HTTPMethod.GET, HTTPMethod.HEAD)
+                and not stream
+                and auth is None
+                and not any(k.lower() in ('authorization', 'cookie') for k in request_headers)
+            ):
+                cache_key = self._cache_key(method.value, url, params, request_headers)
+                cached = await self._cache_get(cache_key)
+                if cached is not None:
+                    logger.debug(f"Cache hit for {method} {url}")
+                    return cached
+
+
             # Make the request
             request_kwargs = {
                 "headers": request_headers,
                 "params": params,
-                "timeout": aiohttp.ClientTimeout(total=timeout),
-                "allow_redirects": allow_redirects,
-                "ssl": ssl_context,
+                "timeout": timeout,
+                "follow_redirects": allow_redirects,
             }
-            
-            # Add request body based on content type
+
+            # Add request body based on content type; startswith on the
+            # short literal beats a substring scan of the header value
             if data is not None:
-                if isinstance(data, (dict, list)) and 'application/json' in request_headers.get('Content-Type', ''):
-                    request_kwargs["json"] = data
+                is_json_ct = request_headers.get('Content-Type', '').startswith('application/json')
+                if is_json_ct and isinstance(data, (dict, list)):
+                    request_kwargs["content"] = orjson.dumps(data)
+                elif isinstance(data, (str, bytes)):
+                    request_kwargs["content"] = data
                 else:
                     request_kwargs["data"] = data
             elif json_data is not None:
-                request_kwargs["json"] = json_data
-            
+                request_kwargs["content"] = orjson.dumps(json_data)
+
             # Log the request
             logger.info(f"Making {method} request to {url}")
-            
-            # Make the actual request
-            async with self.session.request(method.value, url, **request_kwargs) as response:
-                # Read response content
+
+            # Make the actual request; stream so large bodies can be capped
+            # before they are fully buffered
+            client = await self._get_client(verify_ssl)
+            async with client.stream(method.value, url, **request_kwargs) as response:
+                # Read response content; lowercase once and classify the base
+                # media type by set membership instead of a substring scan
                 content_type = response.headers.get('Content-Type', '').lower()
-                is_json = 'application/json' in content_type
-                
+                base_type = content_type.split(';', 1)[0].strip()
+                is_json = base_type in _JSON_CONTENT_TYPES or base_type.endswith('+json')
+
                 response_data = {
-                    "status": response.status,
+                    "status": response.status_code,
                     "headers": dict(response.headers),
                     "url": str(response.url),
                     "content_type": content_type,
-                    "is_success": 200 <= response.status < 300,
+                    "is_success": 200 <= response.status_code < 300,
                 }
-                
-                # Handle different content types
-                if is_json:
+
+                # Stream the body when asked to, or when the server declares a
+                # payload larger than the cap — avoids buffering tens of MB
+                # for responses the LLM will only summarize anyway.
+                content_length = int(response.headers.get('Content-Length') or 0)
+                if stream or content_length > max_bytes:
+                    body = _acquire_buffer()
                     try:
-                        response_data["data"] = await response.json()
-                    except Exception as e:
-                        logger.warning(f"Failed to parse JSON response: {e}")
-                        response_data["data"] = await response.text()
+                        async for chunk in response.aiter_bytes(64 * 1024):
+                            body.extend(chunk)
+                            if len(body) >= max_bytes:
+                                del body[max_bytes:]
+                                response_data["truncated"] = True
+                                break
+                        text = bytes(body).decode('utf-8', errors='replace')
+                        if is_json and not response_data.get("truncated"):
+                            try:
+                                response_data["data"] = orjson.loads(bytes(body))
+                            except orjson.JSONDecodeError:
+                                response_data["data"] = text
+                        else:
+                            response_data["data"] = text
+                    finally:
+                        _release_buffer(body)
                 else:
-                    response_data["data"] = await response.text()
-                
+                    raw = await response.aread()
+                    if is_json:
+                        try:
+                            response_data["data"] = orjson.loads(raw)
+                        except orjson.JSONDecodeError as e:
+                            logger.warning(f"Failed to parse JSON response: {e}")
+                            response_data["data"] = raw.decode('utf-8', errors='replace')
+                    else:
+                        response_data["data"] = raw.decode('utf-8', errors='replace')
+
+                # Cache successful idempotent responses for their TTL
+                if cache_key is not None and response_data["is_success"]:
+                    ttl = self._cache_ttl(response.headers)
+                    if ttl > 0:
+                        await self._cache_put(cache_key, response_data, ttl)
+
                 return response_data
-                
-        except aiohttp.ClientError as e:
+
+        except httpx.HTTPError as e:
             logger.error(f"API request failed: {str(e)}", exc_info=True)
             return {
                 "error": f"API request failed: {str(e)}",
@@ -169,22 +436,16 @@ class APICaller:
         """
         auth_type = auth_config.get('type', '').lower()
         headers = {}
-        
+
         if auth_type == 'basic' and 'username' in auth_config and 'password' in auth_config:
-            import base64
-            credentials = f"{auth_config['username']}:{auth_config['password']}"
-            encoded_credentials = base64.b64encode(credentials.encode('utf-8')).decode('utf-8')
-            headers['Authorization'] = f"Basic {encoded_credentials}"
-            
-        elif auth_type == 'bearer' and 'token' in auth_config:
+            headers['Authorization'] = _basic_auth(auth_config['username'], auth_config['password'])
+
+        elif auth_type in ('bearer', 'oauth2') and 'token' in auth_config:
             headers['Authorization'] = f"Bearer {auth_config['token']}"
-            
+
         elif auth_type == 'api_key' and 'key' in auth_config and 'value' in auth_config:
             headers[auth_config['key']] = auth_config['value']
-            
-        elif auth_type == 'oauth2' and 'token' in auth_config:
-            headers['Authorization'] = f"Bearer {auth_config['token']}"
-        
+
         return headers
     
     async def call_from_natural_language(
@@ -248,6 +509,22 @@ class APICaller:
         Returns:
             Dictionary containing the parsed request components
         """
+        # Fast path: the agent frequently emits just a raw URL. Recognize
+        # that without any regex work and return a plain GET immediately.
+        stripped = request.strip()
+        if stripped.startswith(('http://', 'https://')) and ' ' not in stripped:
+            parsed_url = urlparse(stripped)
+            return {
+                'method': 'GET',
+                'url': f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}",
+                'headers': {},
+                'params': dict(parse_qsl(parsed_url.query)),
+                'data': None,
+                'auth': None,
+                'timeout': 30,
+                'verify_ssl': True
+            }
+
         # Default values
         result = {
             'method': 'GET',
@@ -261,13 +538,13 @@ class APICaller:
         }
         
         # Extract HTTP method
-        method_match = re.search(r'^(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS)\s+', request, re.IGNORECASE)
+        method_match = _METHOD_RE.search(request)
         if method_match:
             result['method'] = method_match.group(1).upper()
             request = request[method_match.end():].strip()
-        
+
         # Extract URL
-        url_match = re.search(r'(https?://[^\s\?&#]+|www\.[^\s\?&#]+)', request, re.IGNORECASE)
+        url_match = _URL_RE.search(request)
         if not url_match:
             raise ValueError("Could not find a valid URL in the request")
         
@@ -286,7 +563,7 @@ class APICaller:
         remaining_text = request[url_match.end():].strip()
         
         # Look for API key in the text
-        api_key_match = re.search(r'(?:api[_-]?key|token)[\s:]+([\w-]+)', remaining_text, re.IGNORECASE)
+        api_key_match = _API_KEY_RE.search(remaining_text)
         if api_key_match:
             result['auth'] = {
                 'type': 'api_key',
@@ -295,7 +572,7 @@ class APICaller:
             }
         
         # Look for basic auth
-        auth_match = re.search(r'user(?:name)?[\s:]+([^\s,;]+)[\s,;]+pass(?:word)?[\s:]+([^\s,;]+)', remaining_text, re.IGNORECASE)
+        auth_match = _BASIC_AUTH_RE.search(remaining_text)
         if auth_match:
             result['auth'] = {
                 'type': 'basic',
@@ -304,43 +581,38 @@ class APICaller:
             }
         
         # Look for JSON body
-        json_match = re.search(r'\{.*\}', remaining_text, re.DOTALL)
-        if json_match:
+        json_body = _extract_json_object(remaining_text)
+        if json_body:
             try:
-                result['json'] = json.loads(json_match.group(0))
-            except json.JSONDecodeError:
+                result['json'] = orjson.loads(json_body)
+            except orjson.JSONDecodeError:
                 pass
-        
+
         # Look for form data
-        form_match = re.findall(r'(\w+)=([^\s,;]+)', remaining_text)
+        form_match = _FORM_RE.findall(remaining_text)
         if form_match and 'json' not in result:
             result['data'] = {k: v for k, v in form_match}
         
         return result
 
-    def __del__(self):
-        """Ensure the session is closed when the object is destroyed."""
-        if hasattr(self, 'session') and self.session and not self.session.closed:
-            asyncio.create_task(self.close())
-
 # Example usage
 async def example():
-    async with aiohttp.ClientSession() as session:
-        caller = APICaller(session)
-        
+    caller = APICaller()
+    try:
         # Example 1: Simple GET request
         response = await caller.call(
             "https://api.github.com/repos/octocat/hello-world",
             method="GET"
         )
-        print(json.dumps(response, indent=2))
-        
+        print(orjson.dumps(response, option=orjson.OPT_INDENT_2).decode())
+
         # Example 2: Using natural language
         response = await caller.call_from_natural_language(
             "GET https://api.github.com/repos/octocat/hello-world"
         )
-        print(json.dumps(response, indent=2))
+        print(orjson.dumps(response, option=orjson.OPT_INDENT_2).decode())
+    finally:
+        await APICaller.aclose()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(example())
@@ -1,20 +1,226 @@
 import os
 import re
+import copy
 import json
 import logging
 import asyncio
+import time
 from typing import Dict, List, Optional, Any, Tuple, Union
 from urllib.parse import urlparse
 from datetime import datetime
 
+from functools import lru_cache
+from itertools import islice
+
 import aiohttp
 import tiktoken
+from cachetools import TTLCache
 from github import Github, GithubException
+from urllib3.util.retry import Retry
 
 from utils.config import settings
+from .http_session import get_http_session
+
+# mistune parses markdown to an AST in C — both faster and more correct
+# than line-by-line regex scanning — but stays optional: the regex path
+# below remains as the fallback.
+try:
+    import mistune
+    _MARKDOWN = mistune.create_markdown(renderer=None)
+except ImportError:
+    _MARKDOWN = None
 
 logger = logging.getLogger(__name__)
 
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# One GraphQL query replaces the ~6 serial REST round-trips the analyzer
+# used to make: metadata, languages, license, contributors, README and the
+# top-level tree all come back in a single response, with issues/PRs
+# included on demand. The field set lives in a fragment so the batch path
+# can alias it across many repositories in one request.
+_REPO_FRAGMENT = """
+fragment RepoFields on Repository {
+  stargazerCount
+  description
+  createdAt
+  updatedAt
+  pushedAt
+  primaryLanguage { name }
+  languages(first: 10) { edges { size node { name } } }
+  licenseInfo { key name url }
+  mentionableUsers(first: 10) { nodes { login } }
+  readme: object(expression: "HEAD:README.md") { ... on Blob { text } }
+  tree: object(expression: "HEAD:") { ... on Tree { entries { name type path } } }
+  issues(first: 5, states: OPEN, orderBy: {field: CREATED_AT, direction: DESC}) @include(if: $includeIssues) {
+    nodes { title number state createdAt author { login } comments { totalCount } }
+  }
+  pullRequests(first: 5, states: OPEN, orderBy: {field: CREATED_AT, direction: DESC}) @include(if: $includePullRequests) {
+    nodes {
+      title number state createdAt author { login }
+      comments { totalCount } commits { totalCount } additions deletions
+    }
+  }
+}
+"""
+
+_REPO_QUERY = """
+query($owner: String!, $name: String!, $includeIssues: Boolean!, $includePullRequests: Boolean!) {
+  repository(owner: $owner, name: $name) { ...RepoFields }
+}
+""" + _REPO_FRAGMENT
+
+
+def _build_batch_query(count: int) -> str:
+    """Build an aliased query fetching `count` repositories in one call."""
+    args = ["$includeIssues: Boolean!", "$includePullRequests: Boolean!"]
+    selections = []
+    for i in range(count):
+        args.append(f"$o{i}: String!")
+        args.append(f"$n{i}: String!")
+        selections.append(f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepoFields }}")
+    return (
+        "query(" + ", ".join(args) + ") {\n" + "\n".join(selections) + "\n}\n"
+    ) + _REPO_FRAGMENT
+
+# Compiled once at import: GitHub URL forms accepted by _extract_repo_info,
+# and the markdown section/bullet shapes scanned in README parsing.
+_REPO_URL_PATTERNS = [
+    re.compile(r'github\.com/([^/]+)/([^/]+?)(?:\.git|/|$)'),
+    re.compile(r'github\.com/([^/]+)/([^/]+?)/?$'),
+]
+_SECTION_RE = re.compile(r'^#+\s*(.*)$')
+_BULLET_RE = re.compile(r'^\s*(?:[-*]|\d+\.)\s+(.+)$')
+
+# READMEs can run to megabytes; everything we extract lives near the top,
+# so cap what we decode and scan
+_README_MAX_BYTES = 65536
+
+# Analysis results change on the order of minutes-to-hours, so repeated
+# requests for the same repo are served from a TTL cache. Per-key locks
+# prevent a thundering herd of identical fetches on a cold entry.
+_ANALYSIS_CACHE: TTLCache = TTLCache(maxsize=512, ttl=600)
+_ANALYSIS_LOCKS: Dict[tuple, asyncio.Lock] = {}
+
+# In-flight batch fetches keyed like the cache, so concurrent analyze_many
+# calls for overlapping repos coalesce onto one request per key.
+_INFLIGHT: Dict[tuple, "asyncio.Future[Dict[str, Any]]"] = {}
+
+# Framework-specific file hints shared by the REST and GraphQL scan paths
+_FRAMEWORK_HINTS = {
+    'django': ['manage.py', 'wsgi.py'],
+    'flask': ['app.py', 'application.py', 'wsgi.py'],
+    'react': ['src/App.js', 'src/index.js'],
+    'angular': ['angular.json', 'src/app'],
+    'vue': ['vue.config.js', 'src/main.js'],
+    'next': ['next.config.js', 'pages/'],
+    'nuxt': ['nuxt.config.js', 'pages/'],
+    'laravel': ['artisan', 'app/Http/Controllers'],
+    'rails': ['Gemfile.lock', 'app/controllers'],
+    'spring': ['src/main/java', 'src/main/resources'],
+}
+
+# Inverted hint tables built once at import: plain filenames resolve with a
+# single dict lookup (a name like wsgi.py can vote for several frameworks),
+# and only path-shaped hints still need a substring check.
+_EXACT_HINTS: Dict[str, Tuple[str, ...]] = {}
+_PATH_HINTS: List[Tuple[str, str]] = []
+for _framework, _hints in _FRAMEWORK_HINTS.items():
+    for _hint in _hints:
+        _hint_lower = _hint.lower()
+        if '/' in _hint_lower:
+            _PATH_HINTS.append((_hint_lower, _framework))
+        else:
+            _EXACT_HINTS[_hint_lower] = _EXACT_HINTS.get(_hint_lower, ()) + (_framework,)
+_ALL_FRAMEWORKS = frozenset(_FRAMEWORK_HINTS)
+
+# Lowercased primary language -> fallback functionality label
+_LANG_TO_FUNCTIONALITY = {
+    "python": "Python Application",
+    "javascript": "JavaScript Application",
+    "typescript": "TypeScript Application",
+    "java": "Java Application",
+    "go": "Go Application",
+    "rust": "Rust Application",
+    "ruby": "Ruby Application",
+    "php": "PHP Application",
+    "c#": "C# Application",
+    "c++": "C++ Application",
+}
+
+class GitHubRateLimiter:
+    """
+    Async throttle that respects GitHub's rate-limit headers.
+
+    A semaphore caps concurrent outbound calls, and the remaining budget
+    and reset time are refreshed from X-RateLimit-* headers on every
+    response, so callers queue until the window resets instead of burning
+    round-trips on 403 secondary-limit errors.
+    """
+
+    def __init__(self, concurrency: int = 10):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.remaining = 5000
+        self.reset_at = 0.0
+
+    async def __aenter__(self) -> "GitHubRateLimiter":
+        await self._semaphore.acquire()
+        await self.wait_if_exhausted()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+    async def wait_if_exhausted(self):
+        """Sleep until the rate-limit window resets if the budget is spent."""
+        if self.remaining <= 0:
+            delay = max(self.reset_at - time.time(), 0.0)
+            if delay:
+                logger.warning(f"GitHub rate limit exhausted, sleeping {delay:.0f}s")
+                await asyncio.sleep(delay)
+            self.remaining = 1
+
+    def update_from_headers(self, headers) -> None:
+        """Refresh the budget from a response's X-RateLimit-* headers."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_at = headers.get("X-RateLimit-Reset")
+        if remaining is not None:
+            try:
+                self.remaining = int(remaining)
+            except ValueError:
+                pass
+        if reset_at is not None:
+            try:
+                self.reset_at = float(reset_at)
+            except ValueError:
+                pass
+
+
+# One limiter per token so all analyzer instances share the same budget
+_RATE_LIMITERS: Dict[str, GitHubRateLimiter] = {}
+
+
+def _get_rate_limiter(token: Optional[str]) -> GitHubRateLimiter:
+    key = token or ""
+    limiter = _RATE_LIMITERS.get(key)
+    if limiter is None:
+        limiter = _RATE_LIMITERS.setdefault(key, GitHubRateLimiter())
+    return limiter
+
+
+@lru_cache(maxsize=4)
+def _gh_client(token: Optional[str]) -> Github:
+    """One PyGithub client per token.
+
+    The Github object holds a requests.Session with keepalive pooling, so
+    sharing it preserves warm connections to api.github.com instead of
+    paying a TLS handshake per analyzer. per_page=100 lets paginated
+    fetches return in a single page, and transient 5xx/connection errors
+    retry with backoff at the transport layer.
+    """
+    return Github(token, per_page=100, retry=Retry(total=3, backoff_factor=0.5))
+
+
 class GitHubAnalyzer:
     """
     A tool for analyzing GitHub repositories.
@@ -22,29 +228,32 @@ class GitHubAnalyzer:
     and gather metadata about the project.
     """
     
-    def __init__(self, github_token: str = None):
-        """Initialize the GitHub analyzer with an optional GitHub token."""
+    def __init__(self, github_token: str = None, session: Optional[aiohttp.ClientSession] = None):
+        """Initialize the GitHub analyzer with an optional token and session.
+
+        When no session is injected, the process-wide pooled session is
+        used, so the analyzer never pays its own TCP/TLS handshakes.
+        """
         self.github_token = github_token or settings.GITHUB_TOKEN
-        self.github = Github(self.github_token) if self.github_token else Github()
-        self.session = aiohttp.ClientSession()
-        self.rate_limit_remaining = 5000  # Default rate limit
-        self.rate_limit_reset = 0
-    
+        self.github = _gh_client(self.github_token or None)
+        self._session = session
+        self.limiter = _get_rate_limiter(self.github_token)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The injected session, or the shared application-wide one."""
+        return self._session or get_http_session()
+
     async def close(self):
-        """Close the aiohttp session."""
-        if not self.session.closed:
-            await self.session.close()
-    
+        """Close an injected session. The shared session is lifespan-owned."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
     def _extract_repo_info(self, url: str) -> Tuple[str, str]:
         """Extract owner and repo name from GitHub URL."""
         # Handle various GitHub URL formats
-        patterns = [
-            r'github\.com/([^/]+)/([^/]+?)(?:\.git|/|$)',
-            r'github\.com/([^/]+)/([^/]+?)/?$',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        for pattern in _REPO_URL_PATTERNS:
+            match = pattern.search(url)
             if match:
                 return match.group(1), match.group(2)
         
@@ -55,6 +264,41 @@ class GitHubAnalyzer:
         
         raise ValueError(f"Could not extract owner and repo from URL: {url}")
     
+    async def _throttled(self, awaitable):
+        """Await a call under the shared rate limiter."""
+        async with self.limiter:
+            return await awaitable
+
+    async def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a GraphQL query against the GitHub v4 API, honoring rate limits."""
+        headers = {
+            "Authorization": f"Bearer {self.github_token}",
+            "Accept": "application/json",
+        }
+        for attempt in (0, 1):
+            async with self.limiter:
+                async with self.session.post(
+                    GITHUB_GRAPHQL_URL,
+                    json={"query": query, "variables": variables},
+                    headers=headers,
+                ) as response:
+                    self.limiter.update_from_headers(response.headers)
+
+                    # Secondary rate limit: honor Retry-After once, then retry
+                    if response.status == 403 and attempt == 0:
+                        retry_after = response.headers.get("Retry-After")
+                        if retry_after:
+                            logger.warning(f"GitHub 403, retrying after {retry_after}s")
+                            await asyncio.sleep(int(retry_after))
+                            continue
+
+                    payload = await response.json()
+                    if response.status != 200 or payload.get("errors"):
+                        raise RuntimeError(
+                            f"GraphQL query failed (status {response.status}): {payload.get('errors')}"
+                        )
+                    return payload["data"]
+
     async def analyze_repository(
         self,
         url: str,
@@ -64,24 +308,294 @@ class GitHubAnalyzer:
     ) -> Dict[str, Any]:
         """
         Analyze a GitHub repository and return structured information.
-        
+
+        Uses a single GraphQL query when a token is configured (one round
+        trip instead of half a dozen REST calls); falls back to the PyGithub
+        REST path for anonymous access or on GraphQL errors.
+
         Args:
             url: GitHub repository URL or owner/repo string
             analyze_code: Whether to analyze the codebase (can be slow for large repos)
             include_issues: Whether to include issue analysis
             include_pull_requests: Whether to include pull request analysis
-            
+
         Returns:
             Dict containing repository analysis
         """
         try:
-            # Extract owner and repo from URL
             owner, repo_name = self._extract_repo_info(url)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        key = (owner, repo_name, analyze_code, include_issues, include_pull_requests)
+        cached = _ANALYSIS_CACHE.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        lock = _ANALYSIS_LOCKS.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another task may have filled the entry while we waited
+            cached = _ANALYSIS_CACHE.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+            if self.github_token:
+                try:
+                    result = await self._analyze_repository_graphql(
+                        owner, repo_name, analyze_code, include_issues, include_pull_requests
+                    )
+                except Exception as e:
+                    logger.warning(f"GraphQL analysis failed, falling back to REST: {e}")
+                    result = await self._analyze_repository_rest(
+                        owner, repo_name, analyze_code, include_issues, include_pull_requests
+                    )
+            else:
+                result = await self._analyze_repository_rest(
+                    owner, repo_name, analyze_code, include_issues, include_pull_requests
+                )
+
+            if "error" not in result:
+                _ANALYSIS_CACHE[key] = copy.deepcopy(result)
+            return result
+
+    async def analyze_many(
+        self,
+        urls: List[str],
+        analyze_code: bool = True,
+        include_issues: bool = False,
+        include_pull_requests: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several repositories in one aliased GraphQL query.
+
+        All repos sharing this call's flags are fetched in a single round
+        trip instead of one HTTPS request each. Results come back in input
+        order; cached entries skip the network entirely, and keys already
+        being fetched by a concurrent call are awaited rather than fetched
+        twice. Without a token there is no GraphQL access, so repos are
+        analyzed concurrently through the per-repo path instead.
+        """
+        if not self.github_token:
+            return list(await asyncio.gather(*(
+                self.analyze_repository(
+                    url,
+                    analyze_code=analyze_code,
+                    include_issues=include_issues,
+                    include_pull_requests=include_pull_requests,
+                ) for url in urls
+            )))
+
+        loop = asyncio.get_running_loop()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(urls)
+        pending: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        owned: Dict[tuple, "asyncio.Future[Dict[str, Any]]"] = {}
+
+        for i, url in enumerate(urls):
+            try:
+                owner, repo_name = self._extract_repo_info(url)
+            except ValueError as e:
+                results[i] = {"error": str(e)}
+                continue
+            key = (owner, repo_name, analyze_code, include_issues, include_pull_requests)
+            cached = _ANALYSIS_CACHE.get(key)
+            if cached is not None:
+                results[i] = copy.deepcopy(cached)
+                continue
+            future = _INFLIGHT.get(key)
+            if future is None:
+                future = loop.create_future()
+                _INFLIGHT[key] = future
+                owned[key] = future
+            pending[i] = future
+
+        try:
+            if owned:
+                keys = list(owned)
+                variables: Dict[str, Any] = {
+                    "includeIssues": include_issues,
+                    "includePullRequests": include_pull_requests,
+                }
+                for idx, key in enumerate(keys):
+                    variables[f"o{idx}"] = key[0]
+                    variables[f"n{idx}"] = key[1]
+                try:
+                    data = await self._graphql(_build_batch_query(len(keys)), variables)
+                except Exception as e:
+                    logger.warning(f"Batch GraphQL query failed, falling back to REST per repo: {e}")
+                    data = None
+                for idx, key in enumerate(keys):
+                    try:
+                        if data is not None:
+                            result = self._map_graphql_repo(
+                                data.get(f"r{idx}"), key[0], key[1],
+                                analyze_code, include_issues, include_pull_requests,
+                            )
+                        else:
+                            result = await self._analyze_repository_rest(
+                                key[0], key[1], analyze_code, include_issues, include_pull_requests
+                            )
+                    except Exception as e:
+                        result = {"error": f"Failed to analyze repository: {e}"}
+                    if "error" not in result:
+                        _ANALYSIS_CACHE[key] = copy.deepcopy(result)
+                    owned[key].set_result(result)
+        finally:
+            # Always deregister; cancel anything left unresolved so waiters
+            # in concurrent calls are not stranded.
+            for key, future in owned.items():
+                _INFLIGHT.pop(key, None)
+                if not future.done():
+                    future.cancel()
+
+        for i, future in pending.items():
+            results[i] = copy.deepcopy(await future)
+
+        return results
+
+    @classmethod
+    def cache_clear(cls):
+        """Drop all cached analyses (used by tests)."""
+        _ANALYSIS_CACHE.clear()
+        _ANALYSIS_LOCKS.clear()
+
+    async def _analyze_repository_graphql(
+        self,
+        owner: str,
+        repo_name: str,
+        analyze_code: bool,
+        include_issues: bool,
+        include_pull_requests: bool,
+    ) -> Dict[str, Any]:
+        """Fetch and map the full repository analysis from one GraphQL query."""
+        data = await self._graphql(_REPO_QUERY, {
+            "owner": owner,
+            "name": repo_name,
+            "includeIssues": include_issues,
+            "includePullRequests": include_pull_requests,
+        })
+        return self._map_graphql_repo(
+            data.get("repository"), owner, repo_name,
+            analyze_code, include_issues, include_pull_requests,
+        )
+
+    def _map_graphql_repo(
+        self,
+        repo: Optional[Dict[str, Any]],
+        owner: str,
+        repo_name: str,
+        analyze_code: bool,
+        include_issues: bool,
+        include_pull_requests: bool,
+    ) -> Dict[str, Any]:
+        """Map one GraphQL repository payload into the analysis dict."""
+        if not repo:
+            return {"error": f"Could not access repository: {owner}/{repo_name}"}
+
+        languages = {
+            edge["node"]["name"]: edge["size"]
+            for edge in repo["languages"]["edges"]
+        }
+        primary_language = (repo.get("primaryLanguage") or {}).get("name") or "Unknown"
+
+        result = {
+            "stars": repo["stargazerCount"],
+            "contributors": [
+                node["login"] for node in repo["mentionableUsers"]["nodes"]
+            ],
+            "description": repo.get("description") or "",
+            "appname": repo_name,
+            "reponame": f"{owner}/{repo_name}",
+            "features": "",
+            "usecases": "",
+            "languages": languages,
+            "license_info": repo.get("licenseInfo"),
+            "created_at": repo.get("createdAt") or "",
+            "updated_at": repo.get("updatedAt") or "",
+            "pushed_at": repo.get("pushedAt") or "",
+            "codebase_analysis": {
+                "main_technologies": list(languages.keys())[:5],
+                "architecture_pattern": "",
+                "key_modules": [],
+                "primary_functionality": ""
+            }
+        }
+
+        readme_obj = repo.get("readme")
+        if readme_obj and readme_obj.get("text"):
+            result["readme"] = readme_obj["text"][:_README_MAX_BYTES]
+            features, usecases = self._extract_features_from_readme(result["readme"])
+            if features:
+                result["features"] = features
+            if usecases:
+                result["usecases"] = usecases
+
+        if analyze_code:
+            tree = repo.get("tree") or {}
+            entries = [
+                (entry["name"], entry["path"], entry["type"] == "tree")
+                for entry in tree.get("entries") or []
+            ]
+            detected_frameworks, has_src, has_tests, has_docs = self._scan_entries(entries)
+
+            architecture = "Monolithic"
+            if len(detected_frameworks) > 1:
+                architecture = "Microservices"
+            elif has_src and has_tests and has_docs:
+                architecture = "Structured Monolithic"
+
+            result["codebase_analysis"].update({
+                "architecture_pattern": architecture,
+                "detected_frameworks": list(detected_frameworks),
+                "primary_language": primary_language,
+                "has_tests": has_tests,
+                "has_documentation": has_docs,
+                "primary_functionality": self._infer_functionality(
+                    result["description"], primary_language, detected_frameworks
+                )
+            })
+            if not result["features"]:
+                result["features"] = result["codebase_analysis"]["primary_functionality"]
+
+        if include_issues:
+            result["recent_issues"] = [{
+                "title": issue["title"],
+                "number": issue["number"],
+                "state": issue["state"].lower(),
+                "created_at": issue["createdAt"],
+                "user": (issue.get("author") or {}).get("login"),
+                "comments": issue["comments"]["totalCount"],
+            } for issue in (repo.get("issues") or {}).get("nodes") or []]
+
+        if include_pull_requests:
+            result["recent_pull_requests"] = [{
+                "title": pr["title"],
+                "number": pr["number"],
+                "state": pr["state"].lower(),
+                "created_at": pr["createdAt"],
+                "user": (pr.get("author") or {}).get("login"),
+                "comments": pr["comments"]["totalCount"],
+                "commits": pr["commits"]["totalCount"],
+                "additions": pr["additions"],
+                "deletions": pr["deletions"],
+            } for pr in (repo.get("pullRequests") or {}).get("nodes") or []]
+
+        return result
+
+    async def _analyze_repository_rest(
+        self,
+        owner: str,
+        repo_name: str,
+        analyze_code: bool = True,
+        include_issues: bool = False,
+        include_pull_requests: bool = False,
+    ) -> Dict[str, Any]:
+        """Analyze a repository through the PyGithub REST client (fallback)."""
+        try:
             full_name = f"{owner}/{repo_name}"
-            
+
             # Get repository object
             try:
-                repo = self.github.get_repo(full_name)
+                repo = await self._throttled(asyncio.to_thread(self.github.get_repo, full_name))
             except GithubException as e:
                 logger.error(f"Error accessing repository {full_name}: {e}")
                 return {"error": f"Could not access repository: {str(e)}"}
@@ -108,23 +622,53 @@ class GitHubAnalyzer:
                 }
             }
             
-            # Get contributors
-            try:
-                contributors = repo.get_contributors()
-                result["contributors"] = [c.login for c in list(contributors)[:10]]  # Top 10 contributors
-            except GithubException as e:
-                logger.warning(f"Could not fetch contributors: {e}")
-            
-            # Get languages
-            try:
-                result["languages"] = repo.get_languages()
-                # Add main technologies to codebase analysis
-                if result["languages"]:
-                    result["codebase_analysis"]["main_technologies"] = list(result["languages"].keys())[:5]
-            except GithubException as e:
-                logger.warning(f"Could not fetch languages: {e}")
-            
-            # Get license info
+            # The remaining calls are independent I/O — run the blocking
+            # PyGithub calls in threads and await them together, so wall time
+            # is the slowest RTT instead of the sum of all of them. Paginated
+            # lists are consumed through islice so PyGithub stops fetching
+            # after the first page instead of paging through everything just
+            # to slice the materialized list.
+            tasks = {
+                "contributors": self._throttled(asyncio.to_thread(
+                    lambda: [c.login for c in islice(repo.get_contributors(), 10)]
+                )),
+                "languages": self._throttled(asyncio.to_thread(repo.get_languages)),
+                "readme": self._throttled(asyncio.to_thread(repo.get_readme)),
+            }
+            if analyze_code:
+                tasks["codebase"] = self._analyze_codebase(repo)
+            if include_issues:
+                tasks["issues"] = self._throttled(asyncio.to_thread(
+                    lambda: list(islice(
+                        repo.get_issues(state="open", sort="created", direction="desc"), 5
+                    ))
+                ))
+            if include_pull_requests:
+                tasks["pulls"] = self._throttled(asyncio.to_thread(
+                    lambda: list(islice(
+                        repo.get_pulls(state="open", sort="created", direction="desc"), 5
+                    ))
+                ))
+
+            values = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            fetched = dict(zip(tasks.keys(), values))
+
+            # Contributors
+            contributors = fetched["contributors"]
+            if isinstance(contributors, Exception):
+                logger.warning(f"Could not fetch contributors: {contributors}")
+            else:
+                result["contributors"] = contributors
+
+            # Languages
+            languages = fetched["languages"]
+            if isinstance(languages, Exception):
+                logger.warning(f"Could not fetch languages: {languages}")
+            elif languages:
+                result["languages"] = languages
+                result["codebase_analysis"]["main_technologies"] = list(languages.keys())[:5]
+
+            # License info (attribute of the repo payload, no extra RTT)
             try:
                 if repo.license:
                     result["license_info"] = {
@@ -134,40 +678,40 @@ class GitHubAnalyzer:
                     }
             except GithubException as e:
                 logger.warning(f"Could not fetch license info: {e}")
-            
-            # Get README content
-            try:
-                readme = repo.get_readme()
-                result["readme"] = readme.decoded_content.decode("utf-8")
-                
-                # Extract features and use cases from README
+
+            # README content
+            readme = fetched["readme"]
+            if isinstance(readme, Exception):
+                logger.warning(f"Could not fetch README: {readme}")
+            else:
+                # Decode only the first _README_MAX_BYTES rather than copying
+                # the entire blob into a str
+                result["readme"] = readme.decoded_content[:_README_MAX_BYTES].decode(
+                    "utf-8", errors="ignore"
+                )
                 features, usecases = self._extract_features_from_readme(result["readme"])
                 if features:
                     result["features"] = features
                 if usecases:
                     result["usecases"] = usecases
-                    
-            except GithubException as e:
-                logger.warning(f"Could not fetch README: {e}")
-            
-            # Analyze codebase if requested
+
+            # Codebase analysis
             if analyze_code:
-                try:
-                    code_analysis = await self._analyze_codebase(repo)
-                    if code_analysis:
-                        result["codebase_analysis"].update(code_analysis)
-                        
-                        # If no features from README, try to infer from code analysis
-                        if not result["features"] and "primary_functionality" in result["codebase_analysis"]:
-                            result["features"] = result["codebase_analysis"]["primary_functionality"]
-                            
-                except Exception as e:
-                    logger.error(f"Error during code analysis: {e}", exc_info=True)
-            
-            # Get recent issues if requested
+                code_analysis = fetched["codebase"]
+                if isinstance(code_analysis, Exception):
+                    logger.error(f"Error during code analysis: {code_analysis}")
+                elif code_analysis:
+                    result["codebase_analysis"].update(code_analysis)
+                    # If no features from README, try to infer from code analysis
+                    if not result["features"] and "primary_functionality" in result["codebase_analysis"]:
+                        result["features"] = result["codebase_analysis"]["primary_functionality"]
+
+            # Recent issues
             if include_issues:
-                try:
-                    issues = repo.get_issues(state="open", sort="created", direction="desc")[:5]  # Last 5 open issues
+                issues = fetched["issues"]
+                if isinstance(issues, Exception):
+                    logger.warning(f"Could not fetch issues: {issues}")
+                else:
                     result["recent_issues"] = [{
                         "title": issue.title,
                         "number": issue.number,
@@ -176,13 +720,13 @@ class GitHubAnalyzer:
                         "user": issue.user.login if issue.user else None,
                         "comments": issue.comments
                     } for issue in issues]
-                except GithubException as e:
-                    logger.warning(f"Could not fetch issues: {e}")
-            
-            # Get recent pull requests if requested
+
+            # Recent pull requests
             if include_pull_requests:
-                try:
-                    pulls = repo.get_pulls(state="open", sort="created", direction="desc")[:5]  # Last 5 open PRs
+                pulls = fetched["pulls"]
+                if isinstance(pulls, Exception):
+                    logger.warning(f"Could not fetch pull requests: {pulls}")
+                else:
                     result["recent_pull_requests"] = [{
                         "title": pr.title,
                         "number": pr.number,
@@ -194,9 +738,7 @@ class GitHubAnalyzer:
                         "additions": pr.additions,
                         "deletions": pr.deletions
                     } for pr in pulls]
-                except GithubException as e:
-                    logger.warning(f"Could not fetch pull requests: {e}")
-            
+
             return result
             
         except Exception as e:
@@ -204,38 +746,124 @@ class GitHubAnalyzer:
             return {"error": f"Failed to analyze repository: {str(e)}"}
     
     def _extract_features_from_readme(self, readme_content: str) -> Tuple[str, str]:
-        """Extract features and use cases from README content."""
+        """Extract features and use cases from README content.
+
+        Callers pass content truncated to _README_MAX_BYTES; features and
+        use-case sections virtually always appear near the top. Prefers a
+        mistune AST walk (handles nested lists and inline markup the
+        line-regex scan misses); falls back to the regex scan when mistune
+        is unavailable.
+        """
+        if _MARKDOWN is None:
+            return self._extract_features_regex(readme_content)
+        try:
+            tokens = _MARKDOWN(readme_content)
+        except Exception as e:
+            logger.warning(f"Markdown parse failed, using regex scan: {e}")
+            return self._extract_features_regex(readme_content)
+
+        features: List[str] = []
+        usecases: List[str] = []
+        target = None
+
+        for token in tokens:
+            token_type = token.get("type")
+            if token_type == "heading":
+                header = self._token_text(token).lower()
+                if "feature" in header:
+                    target = features
+                elif "usecase" in header or "use case" in header or "examples" in header:
+                    target = usecases
+                else:
+                    target = None
+            elif token_type == "list" and target is not None:
+                limit = 5 if target is features else 3
+                for item in token.get("children") or ():
+                    if len(target) >= limit:
+                        break
+                    if item.get("type") == "list_item":
+                        text = self._token_text(item).strip()
+                        if text:
+                            target.append(text)
+            if len(features) >= 5 and len(usecases) >= 3:
+                break
+
+        return ", ".join(features), ", ".join(usecases)
+
+    @classmethod
+    def _token_text(cls, token: Dict[str, Any]) -> str:
+        """Collect the plain text under a mistune AST token."""
+        if "raw" in token:
+            return token["raw"]
+        return "".join(cls._token_text(child) for child in token.get("children") or ())
+
+    def _extract_features_regex(self, readme_content: str) -> Tuple[str, str]:
+        """Line-based fallback extraction used when mistune is missing."""
         features = []
         usecases = []
-        
-        # Simple pattern matching for features and use cases
-        lines = readme_content.split('\n')
+
         in_features_section = False
         in_usecase_section = False
-        
-        for line in lines:
-            line_lower = line.lower()
-            
-            # Detect sections
-            if "feature" in line_lower and ("##" in line or "# " in line):
-                in_features_section = True
-                in_usecase_section = False
-                continue
-            elif "usecase" in line_lower or "use case" in line_lower or "examples" in line_lower:
-                in_features_section = False
-                in_usecase_section = True
+
+        # Single pass with precompiled section/bullet patterns, breaking as
+        # soon as both lists are full
+        for line in readme_content.splitlines():
+            section = _SECTION_RE.match(line)
+            if section:
+                header = section.group(1).lower()
+                in_features_section = 'feature' in header
+                in_usecase_section = (
+                    'usecase' in header or 'use case' in header or 'examples' in header
+                )
                 continue
-            
-            # Extract bullet points or numbered lists
-            if (line.strip().startswith('- ') or line.strip().startswith('* ') or 
-                (line.strip() and line.strip()[0].isdigit() and '. ' in line[:5])):
-                if in_features_section:
-                    features.append(line.strip(' -*').strip())
-                elif in_usecase_section:
-                    usecases.append(line.strip(' -*').strip())
-        
-        return ", ".join(features[:5]), ", ".join(usecases[:3])
+
+            if in_features_section or in_usecase_section:
+                bullet = _BULLET_RE.match(line)
+                if bullet:
+                    if in_features_section and len(features) < 5:
+                        features.append(bullet.group(1).strip())
+                    elif in_usecase_section and len(usecases) < 3:
+                        usecases.append(bullet.group(1).strip())
+                    if len(features) >= 5 and len(usecases) >= 3:
+                        break
+
+        return ", ".join(features), ", ".join(usecases)
     
+    @staticmethod
+    def _scan_entries(entries: List[Tuple[str, str, bool]]) -> Tuple[set, bool, bool, bool]:
+        """
+        Scan top-level (name, path, is_dir) entries for structure markers.
+
+        Returns:
+            Tuple of (detected_frameworks, has_src, has_tests, has_docs)
+        """
+        detected_frameworks = set()
+        has_src = False
+        has_tests = False
+        has_docs = False
+
+        for name, path, is_dir in entries:
+            if is_dir:
+                name_lower = name.lower()
+                if name_lower == 'src':
+                    has_src = True
+                elif name_lower in ('test', 'tests'):
+                    has_tests = True
+                elif name_lower in ('doc', 'docs'):
+                    has_docs = True
+            elif detected_frameworks != _ALL_FRAMEWORKS:
+                # Exact filename hints resolve in one dict lookup; only the
+                # handful of path-fragment hints need a substring scan
+                exact = _EXACT_HINTS.get(name.lower())
+                if exact:
+                    detected_frameworks.update(exact)
+                path_lower = path.lower()
+                for fragment, framework in _PATH_HINTS:
+                    if fragment in path_lower:
+                        detected_frameworks.add(framework)
+
+        return detected_frameworks, has_src, has_tests, has_docs
+
     async def _analyze_codebase(self, repo) -> Dict[str, Any]:
         """
         Analyze the codebase structure and extract key information.
@@ -243,88 +871,42 @@ class GitHubAnalyzer:
         """
         try:
             # Get repository contents (only top-level files and directories)
-            contents = repo.get_contents("")
-            
-            # Look for key files to understand the project structure
-            key_files = {
-                'requirements.txt': 'python',
-                'package.json': 'javascript',
-                'pom.xml': 'java',
-                'build.gradle': 'java',
-                'Dockerfile': 'docker',
-                'docker-compose.yml': 'docker',
-                'Makefile': 'build',
-                'CMakeLists.txt': 'c++',
-                'setup.py': 'python',
-                'pyproject.toml': 'python',
-                'go.mod': 'go',
-                'Cargo.toml': 'rust',
-                'Gemfile': 'ruby',
-                'composer.json': 'php',
-            }
-            
-            # Check for framework-specific files
-            framework_hints = {
-                'django': ['manage.py', 'wsgi.py'],
-                'flask': ['app.py', 'application.py', 'wsgi.py'],
-                'react': ['src/App.js', 'src/index.js'],
-                'angular': ['angular.json', 'src/app'],
-                'vue': ['vue.config.js', 'src/main.js'],
-                'next': ['next.config.js', 'pages/'],
-                'nuxt': ['nuxt.config.js', 'pages/'],
-                'laravel': ['artisan', 'app/Http/Controllers'],
-                'rails': ['Gemfile.lock', 'app/controllers'],
-                'spring': ['src/main/java', 'src/main/resources'],
-            }
-            
-            # Analyze files and directories
-            detected_frameworks = set()
-            has_src = False
-            has_tests = False
-            has_docs = False
-            
-            for item in contents:
-                if item.type == "dir":
-                    if item.name.lower() == 'src':
-                        has_src = True
-                    elif item.name.lower() in ['test', 'tests']:
-                        has_tests = True
-                    elif item.name.lower() in ['doc', 'docs']:
-                        has_docs = True
-                else:
-                    # Check for framework-specific files
-                    for framework, files in framework_hints.items():
-                        for f in files:
-                            if f.lower() in item.path.lower():
-                                detected_frameworks.add(framework)
-            
+            contents = await self._throttled(asyncio.to_thread(repo.get_contents, ""))
+            entries = [
+                (item.name, item.path, item.type == "dir")
+                for item in contents
+            ]
+            detected_frameworks, has_src, has_tests, has_docs = self._scan_entries(entries)
+
             # Determine architecture pattern based on files and structure
             architecture = "Monolithic"  # Default
             if len(detected_frameworks) > 1:
                 architecture = "Microservices"
             elif has_src and has_tests and has_docs:
                 architecture = "Structured Monolithic"
-            
+
             # Get primary language from repository
             primary_language = repo.language or "Unknown"
-            
+
             return {
                 "architecture_pattern": architecture,
                 "detected_frameworks": list(detected_frameworks),
                 "primary_language": primary_language,
                 "has_tests": has_tests,
                 "has_documentation": has_docs,
-                "primary_functionality": self._infer_primary_functionality(repo, primary_language, detected_frameworks)
+                "primary_functionality": self._infer_functionality(
+                    repo.description or "", primary_language, detected_frameworks
+                )
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing codebase: {e}", exc_info=True)
             return {"error": f"Code analysis failed: {str(e)}"}
-    
-    def _infer_primary_functionality(self, repo, primary_language: str, frameworks: set) -> str:
+
+    def _infer_functionality(self, description: str, primary_language: str, frameworks: set) -> str:
         """Infer the primary functionality of the repository."""
         # This is a simplified inference based on repository metadata
-        description = (repo.description or "").lower()
+        description = description.lower()
         
         # Common patterns in repository descriptions
         if any(term in description for term in ["web app", "web application", "website"]):
@@ -346,17 +928,4 @@ class GitHubAnalyzer:
                 return "Enterprise Java Application"
         
         # Fallback based on primary language
-        lang_to_functionality = {
-            "python": "Python Application",
-            "javascript": "JavaScript Application",
-            "typescript": "TypeScript Application",
-            "java": "Java Application",
-            "go": "Go Application",
-            "rust": "Rust Application",
-            "ruby": "Ruby Application",
-            "php": "PHP Application",
-            "c#": "C# Application",
-            "c++": "C++ Application",
-        }
-        
-        return lang_to_functionality.get(primary_lower, "Software Application")
+        return _LANG_TO_FUNCTIONALITY.get(primary_language.lower(), "Software Application")
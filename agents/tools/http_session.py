@@ -0,0 +1,55 @@
+"""Process-wide aiohttp session shared by every tool that still speaks aiohttp.
+
+Creating a ``ClientSession`` per tool instance (or worse, per request) pays a
+fresh TCP + TLS handshake and DNS lookup on every outbound call. Instead the
+application lifespan owns a single pooled session, and tools fetch it lazily
+through :func:`get_http_session` so agent-side usage outside a request also
+hits the same pool.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import aiohttp
+
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared ClientSession, creating it on first use.
+
+    Must be called from a running event loop (aiohttp binds the session to
+    the loop it is created on), which is why creation is deferred rather
+    than done at import time.
+    """
+    global _session
+    if _session is None or _session.closed:
+        # Pool sizing is env-configurable (HTTP_POOL_* settings). The
+        # per-host cap keeps a burst against one API (e.g. api.openai.com
+        # image calls) from starving connections to the other
+        # (api.github.com); enable_cleanup_closed reaps half-closed TLS
+        # transports that would otherwise pin file descriptors.
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True,
+            ),
+            timeout=aiohttp.ClientTimeout(total=120, sock_connect=5, sock_read=60),
+        )
+    return _session
+
+
+async def aclose_http_session() -> None:
+    """Close the shared session. Called from the application lifespan."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -1,19 +1,35 @@
 """Tool for generating an app icon or banner image using the OpenAI Images API (DALL·E)."""
 from __future__ import annotations
 
+import asyncio
 import base64
 import logging
+import random
 from typing import Literal, Dict, Any, Optional
 
 import aiohttp
+from cachetools import TTLCache
 
 from utils.config import settings
+from .http_session import get_http_session
 
 logger = logging.getLogger(__name__)
 
 # Valid image kinds this tool supports
 ImageKind = Literal["icon", "banner"]
 
+# A generation costs 5-20 s of paid API time and is deterministic enough
+# for our prompts that identical (name, kind, size) requests can share a
+# result, so successful URLs are cached for a day. In-flight generations
+# are coalesced through a future registry so N concurrent identical
+# requests trigger one upstream call.
+_RESULT_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=86400)
+_INFLIGHT: Dict[tuple, "asyncio.Future[Dict[str, Any]]"] = {}
+
+# Upstream statuses worth retrying (throttling and transient 5xx)
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_ATTEMPTS = 3
+
 
 class ImageGenerator:
     """Generate an icon or banner image for an app based on its name.
@@ -23,24 +39,59 @@ class ImageGenerator:
     the agent can pass it back to the user.
     """
 
-    def __init__(self):
+    # Cap concurrent upstream generations per process: without it a burst
+    # of /image/generate fans out unbounded to OpenAI and the resulting
+    # 429s surface as user-facing 500s.
+    _sem = asyncio.Semaphore(8)
+
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
         if not settings.OPENAI_API_KEY:
             logger.warning("OPENAI_API_KEY is not configured – ImageGenerator will fail on calls.")
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[aiohttp.ClientSession] = session
 
     async def _ensure_session(self) -> aiohttp.ClientSession:
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
-        return self._session
+        """Return the injected session, or the shared application-wide one."""
+        if self._session is not None and not self._session.closed:
+            return self._session
+        return get_http_session()
 
     async def generate(self, name: str, kind: ImageKind = "icon", size: int = 1024) -> Dict[str, Any]:
         """Generate an image and return a dict with the image URL.
 
+        Repeated requests for the same (name, kind, size) are served from
+        the result cache, and concurrent duplicates await the generation
+        already in flight instead of paying for their own.
+
         Args:
             name: The name of the app / feature.
             kind: Either "icon" (square) or "banner" (wide).
             size: Image dimension (for icons) or height (for banners).
         """
+        key = (name, kind, size)
+        cached = _RESULT_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        inflight = _INFLIGHT.get(key)
+        if inflight is not None:
+            return dict(await inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        _INFLIGHT[key] = future
+        try:
+            result = await self._generate(name, kind, size)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            _RESULT_CACHE[key] = result
+            future.set_result(result)
+            return dict(result)
+        finally:
+            _INFLIGHT.pop(key, None)
+
+    async def _generate(self, name: str, kind: ImageKind, size: int) -> Dict[str, Any]:
+        """Call the OpenAI Images API once, without caching."""
         prompt = self._build_prompt(name, kind)
         dimensions = f"{size}x{size}" if kind == "icon" else f"1024x{size}"
 
@@ -55,13 +106,38 @@ class ImageGenerator:
             "size": dimensions,
         }
         session = await self._ensure_session()
-        async with session.post("https://api.openai.com/v1/images/generations", json=payload, headers=headers, timeout=120) as resp:
-            if resp.status != 200:
-                text = await resp.text()
-                raise RuntimeError(f"OpenAI image generation failed: {resp.status} {text}")
-            data = await resp.json()
-            image_url = data["data"][0]["url"]
-            return {"url": image_url, "kind": kind, "name": name}
+        for attempt in range(_MAX_ATTEMPTS):
+            async with self._sem:
+                async with session.post(
+                    "https://api.openai.com/v1/images/generations",
+                    json=payload, headers=headers, timeout=120,
+                ) as resp:
+                    if resp.status == 200:
+                        data = await resp.json()
+                        image_url = data["data"][0]["url"]
+                        return {"url": image_url, "kind": kind, "name": name}
+
+                    text = await resp.text()
+                    if resp.status not in _RETRY_STATUSES or attempt == _MAX_ATTEMPTS - 1:
+                        raise RuntimeError(f"OpenAI image generation failed: {resp.status} {text}")
+
+                    # Honor Retry-After when sent; otherwise back off
+                    # exponentially with jitter so retries don't re-burst
+                    retry_after = resp.headers.get("Retry-After")
+                    try:
+                        delay = float(retry_after)
+                    except (TypeError, ValueError):
+                        delay = 2 ** attempt + random.random()
+                    logger.warning(
+                        f"OpenAI image API returned {resp.status}, retrying in {delay:.1f}s"
+                    )
+            # Sleep outside the semaphore so waiting requests can proceed
+            await asyncio.sleep(delay)
+
+    @classmethod
+    def cache_clear(cls):
+        """Drop all cached generation results."""
+        _RESULT_CACHE.clear()
 
     @staticmethod
     def _build_prompt(name: str, kind: ImageKind) -> str:
@@ -78,11 +154,3 @@ class ImageGenerator:
             "Elegant, modern abstract illustration, subtle depth, harmonious color gradient, "
             "minimalist style, no text, high-quality UI/UX aesthetic suitable for product landing pages."
         )
-
-    async def __aexit__(self, *exc_info):
-        if self._session and not self._session.closed:
-            await self._session.close()
-
-    async def __del__(self):
-        if hasattr(self, "_session") and self._session and not self._session.closed:
-            await self._session.close()
@@ -0,0 +1,32 @@
+"""Process-wide singleton factories for the agent tools.
+
+Routes used to build a fresh tool per request, paying env lookups and
+(for :class:`GitHubAnalyzer`) PyGithub client construction on every call.
+The tools keep no per-request state — everything mutable lives in the
+shared HTTP session, the analysis caches and the rate limiter — so one
+instance per process is safe to share. The factories are plain callables,
+usable both directly and as FastAPI dependencies via ``Depends(...)``.
+"""
+from functools import lru_cache
+
+from .api_caller import APICaller
+from .git_analyzer import GitHubAnalyzer
+from .image_generator import ImageGenerator
+
+
+@lru_cache(maxsize=1)
+def get_api_caller() -> APICaller:
+    """Return the shared APICaller instance."""
+    return APICaller()
+
+
+@lru_cache(maxsize=1)
+def get_github_analyzer() -> GitHubAnalyzer:
+    """Return the shared GitHubAnalyzer instance."""
+    return GitHubAnalyzer()
+
+
+@lru_cache(maxsize=1)
+def get_image_generator() -> ImageGenerator:
+    """Return the shared ImageGenerator instance."""
+    return ImageGenerator()
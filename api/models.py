@@ -1,5 +1,5 @@
 from typing import Dict, List, Optional, Union, Any
-from pydantic import BaseModel, HttpUrl, Field
+from pydantic import BaseModel, ConfigDict, HttpUrl, Field
 from enum import Enum
 
 class MessageRole(str, Enum):
@@ -9,6 +9,10 @@ class MessageRole(str, Enum):
     TOOL = "tool"
 
 class Message(BaseModel):
+    # Frozen + ignore lets Pydantic use its faster immutable validators on
+    # the hottest model in the API
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     role: MessageRole = MessageRole.USER
     content: str
     name: Optional[str] = None
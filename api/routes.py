@@ -7,6 +7,7 @@ import json
 from utils.config import settings
 from . import models
 from agents.main_agent import get_agent
+from agents.tools.registry import get_api_caller, get_github_analyzer, get_image_generator
 from utils.session_manager import get_session_manager
 
 router = APIRouter()
@@ -14,6 +15,26 @@ router = APIRouter()
 api_router = router
 logger = logging.getLogger(__name__)
 
+async def _stream_chat(agent, session_manager, session_id, chat_history, new_msgs, request):
+    """Yield the agent's response as SSE events and persist the final message."""
+    final_message = None
+    async for chunk in agent.astream(
+        messages=chat_history,
+        session_id=session_id,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens,
+    ):
+        chunk["session_id"] = session_id
+        if chunk.get("done"):
+            final_message = chunk.get("message")
+        yield f"data: {json.dumps(chunk)}\n\n"
+
+    if final_message is not None:
+        session_manager.append_messages(
+            session_id=session_id,
+            messages=new_msgs + [final_message],
+        )
+
 @router.post("/chat", response_model=models.ChatResponse)
 async def chat(
     request: models.ChatRequest,
@@ -29,25 +50,37 @@ async def chat(
         # Get chat history from session
         chat_history = session_manager.get_chat_history(session_id)
         
-        # Add new messages to history
-        new_msgs = [msg.dict() for msg in request.messages]
+        # Add new messages to history. model_dump(mode="json") is the
+        # Pydantic v2 fast path (the .dict() shim is deprecated and slower)
+        # and serializes enum roles to their plain string values.
+        new_msgs = [msg.model_dump(mode="json") for msg in request.messages]
         chat_history.extend(new_msgs)
 
-        # Get agent response with full history
         agent = get_agent()
+
+        # Streamed responses go out as SSE; history is persisted once the
+        # final chunk (carrying the full message) has been produced.
+        if request.stream:
+            return StreamingResponse(
+                _stream_chat(agent, session_manager, session_id, chat_history, new_msgs, request),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"},
+            )
+
+        # Get agent response with full history
         response = await agent.arun(
             messages=chat_history,
             session_id=session_id,
-            stream=request.stream,
             temperature=request.temperature,
             max_tokens=request.max_tokens,
         )
         
-        # Persist updated history (including agent reply)
-        chat_history.append(response["message"])
-        session_manager.update_chat_history(
+        # Persist only this turn's messages — the stored history is
+        # append-only, so re-sending the whole list would both duplicate
+        # every prior message and make each turn O(history) to write.
+        session_manager.append_messages(
             session_id=session_id,
-            messages=chat_history
+            messages=new_msgs + [response["message"]],
         )
         
         return {
@@ -64,14 +97,12 @@ async def chat(
 async def analyze_github_repo(
     request: models.GitHubRepoRequest,
     session_manager=Depends(get_session_manager),
+    analyzer=Depends(get_github_analyzer),
 ):
     """
     Analyze a GitHub repository and return structured information.
     """
     try:
-        from agents.tools.git_analyzer import GitHubAnalyzer
-        
-        analyzer = GitHubAnalyzer()
         result = await analyzer.analyze_repository(
             url=str(request.url),
             analyze_code=request.analyze_code,
@@ -85,17 +116,51 @@ async def analyze_github_repo(
         logger.error(f"Error analyzing GitHub repo: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/analyze/github/batch")
+async def analyze_github_repos(
+    requests: List[models.GitHubRepoRequest],
+    analyzer=Depends(get_github_analyzer),
+):
+    """
+    Analyze several GitHub repositories at once.
+
+    Repositories requested with the same flags share a single aliased
+    GraphQL query, so a bulk catalog refresh costs one round-trip instead
+    of one per repo. Results are returned in request order.
+    """
+    try:
+        # Group by analysis flags; each group shares one batched query
+        groups: Dict[tuple, List[int]] = {}
+        for i, req in enumerate(requests):
+            flags = (req.analyze_code, req.include_issues, req.include_pull_requests)
+            groups.setdefault(flags, []).append(i)
+
+        results: List[Dict[str, Any]] = [{}] * len(requests)
+        for (analyze_code, include_issues, include_pull_requests), indices in groups.items():
+            batch = await analyzer.analyze_many(
+                [str(requests[i].url) for i in indices],
+                analyze_code=analyze_code,
+                include_issues=include_issues,
+                include_pull_requests=include_pull_requests,
+            )
+            for i, result in zip(indices, batch):
+                results[i] = result
+
+        return results
+
+    except Exception as e:
+        logger.error(f"Error analyzing GitHub repos in batch: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/api/call", response_model=models.APICallResponse)
 async def call_api(
     request: models.APICallRequest,
+    caller=Depends(get_api_caller),
 ):
     """
     Make an HTTP API call based on the provided request.
     """
     try:
-        from agents.tools.api_caller import APICaller
-        
-        caller = APICaller()
         response = await caller.call(
             url=str(request.url),
             method=request.method,
@@ -112,11 +177,12 @@ async def call_api(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/image/generate", response_model=models.ImageGenResponse)
-async def generate_image(request: models.ImageGenRequest):
+async def generate_image(
+    request: models.ImageGenRequest,
+    generator=Depends(get_image_generator),
+):
     """Generate an app icon or banner image given a name and kind."""
     try:
-        from agents.tools.image_generator import ImageGenerator
-        generator = ImageGenerator()
         result = await generator.generate(name=request.name, kind=request.kind, size=request.size)
         return result
     except Exception as e:
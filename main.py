@@ -1,9 +1,13 @@
 import uvicorn
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
 from typing import Dict, Any
+import asyncio
 import logging
 import sys
 
@@ -18,6 +22,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own process-wide resources: the pooled HTTP sessions and agent warmup."""
+    from agents.main_agent import warmup
+    from agents.tools.http_session import get_http_session, aclose_http_session
+
+    # Size the default executor for I/O-bound blocking calls: everything
+    # routed through asyncio.to_thread (the PyGithub REST path) shares it,
+    # and the stock CPU-count sizing serializes those calls under load.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=settings.THREAD_POOL_SIZE,
+            thread_name_prefix="blocking-io",
+        )
+    )
+
+    # One pooled aiohttp session for every tool; also exposed on app.state
+    # so routes can inject it explicitly.
+    app.state.http = get_http_session()
+    asyncio.create_task(warmup())
+    yield
+    from agents.tools.api_caller import APICaller
+    await aclose_http_session()
+    await APICaller.aclose()
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
@@ -25,6 +54,10 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    # orjson serializes large nested payloads (repo analyses, chat
+    # histories) several times faster than the stdlib encoder
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -43,15 +76,17 @@ app.include_router(api_router, prefix=settings.API_PREFIX)
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logger.error(f"Validation error: {exc.errors()}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={"detail": exc.errors(), "body": exc.body},
+        # Validation errors can carry non-JSON-native values (exception
+        # objects in ctx, raw bytes bodies) that orjson rejects outright
+        content=jsonable_encoder({"detail": exc.errors(), "body": exc.body}),
     )
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.exception(f"Unhandled exception: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "Internal server error"},
     )
@@ -66,6 +101,14 @@ async def health_check() -> Dict[str, str]:
     """Health check endpoint."""
     return {"status": "healthy"}
 
+# Use uvloop when available (not on Windows): libuv-backed task switching
+# and socket I/O are 2-4x faster than the default selector loop.
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    logger.info("uvloop not available, using the default asyncio event loop")
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -29,6 +30,19 @@ class Settings(BaseSettings):
     
     # Session Settings
     SESSION_EXPIRE_SECONDS: int = 86400  # 24 hours
+    MAX_CHAT_HISTORY: int = int(os.getenv("MAX_CHAT_HISTORY", "50"))  # messages kept per session
+
+    # Shared HTTP pool (aiohttp) — sized so concurrent GitHub and OpenAI
+    # traffic don't contend for the same per-host connections
+    HTTP_POOL_LIMIT: int = int(os.getenv("HTTP_POOL_LIMIT", "200"))
+    HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "32"))
+    HTTP_DNS_CACHE_SECONDS: int = int(os.getenv("HTTP_DNS_CACHE_SECONDS", "600"))
+    HTTP_KEEPALIVE_TIMEOUT: int = int(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "75"))
+
+    # Default-executor threads for blocking calls run via asyncio.to_thread
+    # (PyGithub REST traffic); the stock executor sizes to CPU count, far
+    # too small for I/O-bound work
+    THREAD_POOL_SIZE: int = int(os.getenv("THREAD_POOL_SIZE", "32"))
     
     # Frontend Configuration
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:8501")
@@ -44,16 +58,29 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
-# Create settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build, validate and cache the settings.
+
+    Settings() re-reads the environment and re-validates every field on
+    each instantiation; the cache guarantees that happens once per
+    process no matter how many modules ask.
+    """
+    s = Settings()
+
+    # Validate required settings
+    if not s.OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY environment variable is required")
+
+    # Configure Redis URL with password if provided
+    if s.REDIS_PASSWORD and "@" not in s.REDIS_URL:
+        # Insert password into Redis URL
+        redis_parts = s.REDIS_URL.split("://")
+        if len(redis_parts) == 2:
+            s.REDIS_URL = f"{redis_parts[0]}://:{s.REDIS_PASSWORD}@{redis_parts[1]}"
 
-# Validate required settings
-if not settings.OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY environment variable is required")
+    return s
 
-# Configure Redis URL with password if provided
-if settings.REDIS_PASSWORD and "@" not in settings.REDIS_URL:
-    # Insert password into Redis URL
-    redis_parts = settings.REDIS_URL.split("://")
-    if len(redis_parts) == 2:
-        settings.REDIS_URL = f"{redis_parts[0]}://:{settings.REDIS_PASSWORD}@{redis_parts[1]}"
+# Module-level instance kept so existing `from utils.config import settings`
+# call sites stay valid
+settings = get_settings()
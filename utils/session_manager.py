@@ -1,7 +1,8 @@
-import json
 import uuid
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any
+import orjson
 import redis
 import logging
 from functools import lru_cache
@@ -10,6 +11,57 @@ from utils.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Fetch a session and refresh its TTL in one round trip. The previous
+# read path was GET followed by a SET of the whole re-serialized blob
+# just to bump a timestamp — two RTTs and a full rewrite per read.
+_TOUCH_SCRIPT = """
+local v = redis.call('HGETALL', KEYS[1])
+if #v == 0 then return nil end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return v
+"""
+
+
+def _hash_to_session(flat: List[bytes]) -> Dict:
+    """Rebuild a session dict from HGETALL's flat field/value reply."""
+    fields = {flat[i].decode(): flat[i + 1] for i in range(0, len(flat), 2)}
+    return {
+        "created_at": fields.get("created_at", b"").decode(),
+        "updated_at": fields.get("updated_at", b"").decode(),
+        "data": orjson.loads(fields.get("data", b"{}")),
+    }
+
+# One connection pool per Redis URL, shared by every SessionManager in
+# the process. Each Redis.from_url call would otherwise grow a private
+# pool, so direct SessionManager() construction (tests, background jobs)
+# multiplied sockets. Blocking variant caps connections under load
+# instead of growing without bound.
+_POOLS: Dict[str, redis.BlockingConnectionPool] = {}
+
+
+def _orjson_default(obj: Any):
+    """Serialize pydantic models transparently; reject anything else."""
+    model_dump = getattr(obj, "model_dump", None)
+    if model_dump is not None:
+        return model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _get_pool(redis_url: str) -> redis.BlockingConnectionPool:
+    pool = _POOLS.get(redis_url)
+    if pool is None:
+        pool = _POOLS.setdefault(redis_url, redis.BlockingConnectionPool.from_url(
+            redis_url,
+            max_connections=32,
+            timeout=5,
+            socket_keepalive=True,
+            health_check_interval=30,
+            socket_timeout=5,
+            socket_connect_timeout=5,
+            retry_on_timeout=True,
+        ))
+    return pool
+
 class SessionManager:
     """
     Manages user sessions and chat history using Redis for persistence.
@@ -20,17 +72,16 @@ class SessionManager:
         self.redis_url = redis_url or settings.REDIS_URL
         self.redis = self._get_redis_connection()
         self.session_expire_seconds = settings.SESSION_EXPIRE_SECONDS
+        # register_script handles EVALSHA with automatic NOSCRIPT reload
+        self._touch = self.redis.register_script(_TOUCH_SCRIPT) if self.redis else None
     
     def _get_redis_connection(self):
         """Create and return a Redis connection."""
         try:
-            return redis.Redis.from_url(
-                self.redis_url,
-                decode_responses=True,
-                socket_timeout=5,
-                socket_connect_timeout=5,
-                retry_on_timeout=True,
-            )
+            # decode_responses stays off: every value we read goes straight
+            # into orjson.loads, which parses bytes natively, so an eager
+            # UTF-8 decode would just add an allocation and a copy per read
+            return redis.Redis(connection_pool=_get_pool(self.redis_url))
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             # Fallback to in-memory storage if Redis is not available
@@ -47,23 +98,24 @@ class SessionManager:
             str: The newly created session ID
         """
         session_id = str(uuid.uuid4())
-        session_data = {
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat(),
-            "data": initial_data or {},
-            "chat_history": [],
-        }
-        
+        now = datetime.utcnow().isoformat()
+
         if self.redis:
             try:
-                self.redis.set(
-                    f"session:{session_id}",
-                    json.dumps(session_data),
-                    ex=self.session_expire_seconds
-                )
+                # Metadata lives in a HASH (chat history in its own LIST
+                # key), so later writes touch individual fields instead of
+                # rewriting one serialized blob
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.hset(f"session:{session_id}", mapping={
+                    "created_at": now,
+                    "updated_at": now,
+                    "data": orjson.dumps(initial_data or {}),
+                })
+                pipe.expire(f"session:{session_id}", self.session_expire_seconds)
+                pipe.execute()
             except Exception as e:
                 logger.error(f"Error creating session in Redis: {e}")
-        
+
         return session_id
     
     def get_session(self, session_id: str) -> Optional[Dict]:
@@ -81,20 +133,18 @@ class SessionManager:
             
         if self.redis:
             try:
-                session_data = self.redis.get(f"session:{session_id}")
+                # One round trip: fetch and refresh the TTL server-side.
+                # updated_at reflects the last actual write — reads don't
+                # touch it, the TTL is the liveness signal.
+                session_data = self._touch(
+                    keys=[f"session:{session_id}"],
+                    args=[self.session_expire_seconds],
+                )
                 if session_data:
-                    session = json.loads(session_data)
-                    # Update the updated_at timestamp
-                    session["updated_at"] = datetime.utcnow().isoformat()
-                    self.redis.set(
-                        f"session:{session_id}",
-                        json.dumps(session),
-                        ex=self.session_expire_seconds
-                    )
-                    return session
+                    return _hash_to_session(session_data)
             except Exception as e:
                 logger.error(f"Error getting session from Redis: {e}")
-                
+
         return None
     
     def update_session(self, session_id: str, data: Dict) -> bool:
@@ -113,19 +163,23 @@ class SessionManager:
             
         if self.redis:
             try:
-                session = self.get_session(session_id)
-                if not session:
+                key = f"session:{session_id}"
+                raw = self.redis.hget(key, "data")
+                if raw is None:
                     return False
-                    
-                # Update the session data
-                session["data"].update(data)
-                session["updated_at"] = datetime.utcnow().isoformat()
-                
-                self.redis.set(
-                    f"session:{session_id}",
-                    json.dumps(session),
-                    ex=self.session_expire_seconds
-                )
+
+                # Merge client-side, then write back only the fields that
+                # changed — created_at never travels on this path
+                merged = orjson.loads(raw)
+                merged.update(data)
+
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.hset(key, mapping={
+                    "data": orjson.dumps(merged),
+                    "updated_at": datetime.utcnow().isoformat(),
+                })
+                pipe.expire(key, self.session_expire_seconds)
+                pipe.execute()
                 return True
             except Exception as e:
                 logger.error(f"Error updating session in Redis: {e}")
@@ -147,74 +201,98 @@ class SessionManager:
             
         if self.redis:
             try:
-                return bool(self.redis.delete(f"session:{session_id}"))
+                return bool(self.redis.delete(
+                    f"session:{session_id}",
+                    f"session:{session_id}:history",
+                ))
             except Exception as e:
                 logger.error(f"Error deleting session from Redis: {e}")
                 
         return False
     
-    def get_chat_history(self, session_id: str) -> List[Dict]:
+    def get_chat_history(self, session_id: str) -> Deque[Dict]:
         """
         Get the chat history for a session.
-        
+
         Args:
             session_id: The session ID
-            
+
         Returns:
-            List[Dict]: The chat history as a list of messages
+            Deque[Dict]: The chat history as a ring buffer of messages.
+                maxlen matches the stored trim limit, so appends past the
+                cap drop the oldest turn in O(1) instead of growing the
+                buffer and re-slicing.
         """
-        session = self.get_session(session_id)
-        if session and "chat_history" in session:
-            return session["chat_history"]
-        return []
+        history: List[Dict] = []
+        if session_id and self.redis:
+            try:
+                raw = self.redis.lrange(f"session:{session_id}:history", 0, -1)
+                history = [orjson.loads(msg) for msg in raw]
+            except Exception as e:
+                logger.error(f"Error getting chat history from Redis: {e}")
+        return deque(history, maxlen=settings.MAX_CHAT_HISTORY)
     
-    def update_chat_history(self, session_id: str, messages: List[Dict]) -> bool:
+    def append_messages(self, session_id: str, messages: List[Dict]) -> bool:
         """
-        Update the chat history for a session.
-        
+        Append new messages to a session's chat history.
+
+        The history is a native Redis LIST, so each append pushes only
+        this turn's messages (one message each on the wire) instead of
+        re-serializing and rewriting the whole conversation: RPUSH, the
+        LTRIM to the last N messages, and the TTL refresh travel together
+        in one pipelined round trip.
+
         Args:
             session_id: The session ID
-            messages: List of messages to add to the history
-            
+            messages: The messages added this turn
+
         Returns:
-            bool: True if the update was successful, False otherwise
+            bool: True if the append was successful, False otherwise
         """
         if not session_id or not messages:
             return False
-            
+
         if self.redis:
             try:
-                session = self.get_session(session_id)
-                if not session:
-                    session = {"chat_history": []}
-                
-                # Ensure chat_history exists
-                if "chat_history" not in session:
-                    session["chat_history"] = []
-                
-                # Add new messages to history
-                session["chat_history"].extend([
-                    msg if isinstance(msg, dict) else msg.dict()
+                key = f"session:{session_id}:history"
+                meta_key = f"session:{session_id}"
+                now = datetime.utcnow().isoformat()
+                pipe = self.redis.pipeline(transaction=False)
+                # Create the metadata hash if this session_id has never
+                # been seen (client-supplied ids skip create_session);
+                # HSETNX makes the create-if-missing part of the same
+                # round trip instead of a GET + conditional SET
+                pipe.hsetnx(meta_key, "created_at", now)
+                pipe.hsetnx(meta_key, "data", b"{}")
+                # Appends are writes, so updated_at is stamped
+                # unconditionally — reads alone never move it
+                pipe.hset(meta_key, "updated_at", now)
+                pipe.expire(meta_key, self.session_expire_seconds)
+                # The default hook lets orjson serialize dicts on its fast
+                # path and only falls back to model_dump for pydantic
+                # models, instead of an isinstance branch per message
+                pipe.rpush(key, *[
+                    orjson.dumps(msg, default=_orjson_default)
                     for msg in messages
                 ])
-                
-                # Keep only the last N messages to prevent excessive memory usage
-                max_history = 50  # Adjust based on your needs
-                session["chat_history"] = session["chat_history"][-max_history:]
-                
-                session["updated_at"] = datetime.utcnow().isoformat()
-                
-                self.redis.set(
-                    f"session:{session_id}",
-                    json.dumps(session),
-                    ex=self.session_expire_seconds
-                )
+                pipe.ltrim(key, -settings.MAX_CHAT_HISTORY, -1)
+                pipe.expire(key, self.session_expire_seconds)
+                pipe.execute()
                 return True
             except Exception as e:
                 logger.error(f"Error updating chat history in Redis: {e}")
-                
+
         return False
-    
+
+    def update_chat_history(self, session_id: str, messages: List[Dict]) -> bool:
+        """
+        Backwards-compatible alias for append_messages.
+
+        Despite the name, this has always appended; prefer append_messages
+        in new code so the semantics are explicit.
+        """
+        return self.append_messages(session_id, messages)
+
     def clear_chat_history(self, session_id: str) -> bool:
         """
         Clear the chat history for a session.
@@ -225,7 +303,17 @@ class SessionManager:
         Returns:
             bool: True if the history was cleared, False otherwise
         """
-        return self.update_chat_history(session_id, [])
+        if not session_id:
+            return False
+
+        if self.redis:
+            try:
+                self.redis.delete(f"session:{session_id}:history")
+                return True
+            except Exception as e:
+                logger.error(f"Error clearing chat history in Redis: {e}")
+
+        return False
     
     def clear_session(self, session_id: str) -> bool:
         """
@@ -239,17 +327,18 @@ class SessionManager:
         """
         return self.delete_session(session_id)
 
-# Create a singleton instance
-_session_manager = None
-
+@lru_cache(maxsize=1)
 def get_session_manager() -> SessionManager:
     """
     Get or create a singleton instance of SessionManager.
-    
+
+    lru_cache dedupes instances in steady state (a racing first call can
+    still construct twice — the cache invokes the factory outside its
+    lock). That's harmless here: connection reuse is guaranteed by the
+    pool registry, since _get_pool's setdefault hands every manager for a
+    URL the same BlockingConnectionPool.
+
     Returns:
         SessionManager: The session manager instance
     """
-    global _session_manager
-    if _session_manager is None:
-        _session_manager = SessionManager()
-    return _session_manager
+    return SessionManager()